@@ -2,47 +2,58 @@
 agents.py — Agent definitions, system prompts, and role management.
 """
 
+import io
 import uuid
 from dataclasses import dataclass, field
 from typing import Optional
 
-from config import ROLES, PROVIDERS, DEFAULT_AGENTS
+import orjson
 
+from config import (ROLES, PROVIDERS, DEFAULT_AGENTS, UNKNOWN_ROLE,
+                    RoleCfg, ProviderCfg)
 
-@dataclass
+# Marks the end of the prompt's stable prefix (system prompt, attached
+# context, original question). Everything after it changes every round.
+# The provider layer translates this into the provider's cache-breakpoint
+# API where one exists, and strips it otherwise.
+CACHE_BOUNDARY = "<<<CACHE_BOUNDARY>>>"
+
+
+@dataclass(frozen=True, slots=True)
 class Agent:
-    """Represents a single AI council member."""
+    """Represents a single AI council member.
+
+    Role/provider config is resolved once at construction so the hot paths
+    (`build_messages`, per-step rendering, the sidebar loop) pay a single
+    attribute load instead of repeated dict lookups.
+    """
     id: str
     name: str
     role: str          # key from ROLES
     provider: str      # key from PROVIDERS
     model: str
 
-    @property
-    def role_cfg(self) -> dict:
-        return ROLES.get(self.role, {})
-
-    @property
-    def provider_cfg(self) -> dict:
-        return PROVIDERS.get(self.provider, {})
-
-    @property
-    def color(self) -> str:
-        return self.role_cfg.get("color", "#888888")
-
-    @property
-    def icon(self) -> str:
-        return self.role_cfg.get("icon", "🤖")
-
-    @property
-    def system_prompt(self) -> str:
-        return self.role_cfg.get("system_prompt", "You are a helpful assistant.")
-
-    @property
-    def display_label(self) -> str:
-        role_label = self.role_cfg.get("label", self.role.capitalize())
-        provider_name = self.provider_cfg.get("name", self.provider)
-        return f"{self.icon} {self.name} [{role_label} · {provider_name} / {self.model}]"
+    # Resolved at construction — not part of the public constructor signature.
+    role_cfg: RoleCfg = field(init=False, repr=False, compare=False)
+    provider_cfg: Optional[ProviderCfg] = field(init=False, repr=False, compare=False)
+    color: str = field(init=False, repr=False, compare=False)
+    icon: str = field(init=False, repr=False, compare=False)
+    system_prompt: str = field(init=False, repr=False, compare=False)
+    display_label: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        role_cfg = ROLES.get(self.role, UNKNOWN_ROLE)
+        provider_cfg = PROVIDERS.get(self.provider)
+        provider_name = provider_cfg.name if provider_cfg else self.provider
+        icon = role_cfg.icon
+        object.__setattr__(self, "role_cfg", role_cfg)
+        object.__setattr__(self, "provider_cfg", provider_cfg)
+        object.__setattr__(self, "color", role_cfg.color)
+        object.__setattr__(self, "icon", icon)
+        object.__setattr__(self, "system_prompt", role_cfg.system_prompt)
+        object.__setattr__(
+            self, "display_label",
+            f"{icon} {self.name} [{role_cfg.label} · {provider_name} / {self.model}]")
 
     def to_dict(self) -> dict:
         return {
@@ -54,9 +65,15 @@ class Agent:
         }
 
 
+def agent_to_bytes(agent: Agent) -> bytes:
+    """Serialize an agent to JSON bytes (orjson — much faster than stdlib
+    json for the step/agent payloads that get logged or persisted)."""
+    return orjson.dumps(agent.to_dict())
+
+
 def agent_from_dict(data: dict) -> Agent:
     return Agent(
-        id=data.get("id", str(uuid.uuid4())),
+        id=data["id"] if "id" in data else str(uuid.uuid4()),
         name=data["name"],
         role=data["role"],
         provider=data["provider"],
@@ -64,14 +81,21 @@ def agent_from_dict(data: dict) -> Agent:
     )
 
 
+# Parsed once at import; Agent is frozen, so sharing instances across
+# sessions is safe.
+_DEFAULT_COUNCIL: tuple[Agent, ...] = tuple(agent_from_dict(d) for d in DEFAULT_AGENTS)
+
+
 def default_council() -> list[Agent]:
     """Return the default set of council agents."""
-    return [agent_from_dict(d) for d in DEFAULT_AGENTS]
+    return list(_DEFAULT_COUNCIL)
 
 
 def build_messages(agent: Agent, conversation: list[dict],
                    user_question: str,
-                   context_text: Optional[str] = None) -> list[dict]:
+                   context_text: Optional[str] = None,
+                   include_system: bool = True,
+                   extra_prompt: Optional[str] = None) -> list[dict]:
     """
     Build an OpenAI-style messages list for the agent.
 
@@ -79,29 +103,90 @@ def build_messages(agent: Agent, conversation: list[dict],
         [{"role": "agent_name", "content": "...", "agent_id": "..."}, ...]
 
     We flatten this into a system + user/assistant structure the LLM understands.
+    Pass `include_system=False` when the caller has already established the
+    agent's persona on the provider side (e.g. a cached system prefix).
+    `extra_prompt` carries per-round instructions (e.g. revision guidance);
+    it lands after the cache boundary so the question section above it stays
+    byte-identical — and prefix-cacheable — across rounds.
     """
-    messages: list[dict] = [{"role": "system", "content": agent.system_prompt}]
+    messages: list[dict] = []
+    if include_system:
+        messages.append({"role": "system", "content": agent.system_prompt})
 
-    # Build a context block for the user message
-    parts: list[str] = []
+    # Fast path: nothing but the question — one f-string, no buffer.
+    if not conversation and not context_text and not extra_prompt:
+        messages.append({"role": "user", "content": f"## Question\n{user_question}\n"})
+        return messages
+
+    # Build the user message incrementally instead of list-append + join.
+    buf = io.StringIO()
 
     if context_text:
-        parts.append(f"## Attached Context\n{context_text}\n")
+        buf.write(f"## Attached Context\n{context_text}\n\n")
 
-    parts.append(f"## Question\n{user_question}\n")
+    buf.write(f"## Question\n{user_question}\n")
 
+    if conversation or extra_prompt:
+        # Everything that mutates between rounds (history, per-round
+        # instructions) goes strictly after the cache boundary so the stable
+        # prefix above can hit provider prompt caches.
+        buf.write(f"\n{CACHE_BOUNDARY}\n")
     if conversation:
-        parts.append("## Debate So Far")
+        buf.write("## Debate So Far\n")
         for entry in conversation:
             speaker = entry.get("agent_name", entry.get("role", "Unknown"))
-            parts.append(f"**{speaker}:**\n{entry['content']}\n")
+            buf.write(f"**{speaker}:**\n{entry['content']}\n\n")
+    if extra_prompt:
+        buf.write(f"## Instructions for This Round\n{extra_prompt}\n")
 
-    messages.append({"role": "user", "content": "\n".join(parts)})
+    messages.append({"role": "user", "content": buf.getvalue().rstrip("\n") + "\n"})
     return messages
 
 
+def build_messages_incremental(agent: Agent, conversation: list[dict],
+                               user_question: str,
+                               cache: dict[str, list],
+                               context_text: Optional[str] = None,
+                               extra_prompt: Optional[str] = None) -> list[dict]:
+    """
+    Incremental variant of `build_messages` for repeated calls over a
+    growing history. `cache` is a per-debate dict (keyed by agent id — Agent
+    is frozen, so state can't live on the instance) holding each agent's
+    built message list and how much history it has absorbed. Each call
+    appends only the history entries added since the agent's previous call,
+    so a debate does O(total history) formatting work per agent instead of
+    re-serializing the whole transcript every phase.
+
+    History entries become separate user messages after the stable prefix,
+    which keeps earlier messages byte-identical across phases — the
+    message-list split plays the role of the CACHE_BOUNDARY sentinel here.
+    `extra_prompt` is returned as a trailing message without entering the
+    cache.
+    """
+    entry = cache.get(agent.id)
+    if entry is None:
+        entry = [build_messages(agent, [], user_question, context_text), 0]
+        cache[agent.id] = entry
+    msgs, seen = entry
+
+    if seen < len(conversation):
+        for h in conversation[seen:]:
+            speaker = h.get("agent_name", h.get("role", "Unknown"))
+            header = "## Debate So Far\n\n" if seen == 0 else ""
+            msgs.append({"role": "user",
+                         "content": f"{header}**{speaker}:**\n{h['content']}"})
+            seen += 1
+        entry[1] = seen
+
+    if extra_prompt:
+        return msgs + [{"role": "user",
+                        "content": f"## Instructions for This Round\n{extra_prompt}"}]
+    return msgs
+
+
 def build_vote_messages(agent: Agent, question: str,
-                        final_answer: str) -> list[dict]:
+                        final_answer: str,
+                        include_system: bool = True) -> list[dict]:
     """Build messages asking an agent to vote on the final answer."""
     prompt = (
         f"## Question\n{question}\n\n"
@@ -112,7 +197,34 @@ def build_vote_messages(agent: Agent, question: str,
         "- NEEDS REVISION\n\n"
         "Then on the next line provide a brief (1–2 sentence) reason for your vote."
     )
+    messages: list[dict] = []
+    if include_system:
+        messages.append({"role": "system", "content": agent.system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def build_batch_vote_messages(agents: list[Agent], question: str,
+                              final_answer: str) -> list[dict]:
+    """Build one prompt asking several agents (same provider/model) to vote
+    in a single call. All agents vote on the same (question, final_answer),
+    so batching them cuts the vote round from N calls to one per provider."""
+    personas = "\n".join(
+        f'- agent_id "{a.id}" — {a.name} ({a.role_cfg.label}): {a.system_prompt}'
+        for a in agents
+    )
+    prompt = (
+        f"## Question\n{question}\n\n"
+        f"## Proposed Final Answer\n{final_answer}\n\n"
+        "You are simulating the council members below. Each member votes on "
+        "the proposed final answer independently and in character:\n"
+        f"{personas}\n\n"
+        "Reply with ONLY a JSON array containing one object per member:\n"
+        '[{"agent_id": "<id>", "vote": "APPROVE" or "REJECT" or '
+        '"NEEDS REVISION", "reason": "<1-2 sentence reason>"}, ...]'
+    )
     return [
-        {"role": "system", "content": agent.system_prompt},
+        {"role": "system",
+         "content": "You simulate multiple council personas and reply with strict JSON."},
         {"role": "user", "content": prompt},
     ]
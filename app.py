@@ -5,8 +5,9 @@ Run with:
     streamlit run app.py
 """
 
+import functools
 import io
-import html
+import re
 import uuid
 import time
 
@@ -18,7 +19,7 @@ load_dotenv()
 from config import PROVIDERS, ROLES, DEFAULT_AGENTS
 from agents import Agent, default_council, agent_from_dict
 from debate import run_debate, DebateStep
-from file_handler import extract_text_from_file, format_context
+from file_handler import extract_text_from_file, fetch_url_content, format_context
 from rate_limiter import get_registry
 from providers import is_provider_configured
 
@@ -47,7 +48,7 @@ if "live_steps" not in st.session_state:
 # ---------------------------------------------------------------------------
 # Custom CSS
 # ---------------------------------------------------------------------------
-st.markdown("""
+_CSS = """
 <style>
 .agent-card {
     border-left: 5px solid;
@@ -67,6 +68,7 @@ st.markdown("""
 .vote-approve  { background:#28a745; color:#fff; }
 .vote-reject   { background:#dc3545; color:#fff; }
 .vote-revision { background:#ffc107; color:#000; }
+.vote-skipped  { background:#6c757d; color:#fff; }
 .council-approved {
     padding: 1em;
     border-radius: 8px;
@@ -82,7 +84,77 @@ st.markdown("""
     margin-top: 1em;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Static lookup for render_step; built once instead of per call.
+_STEP_LABELS = {
+    "proposal": "Initial Proposal",
+    "critique": "Critique",
+    "revision": "Revision",
+    "re-evaluation": "Re-evaluation",
+    "specialist": "Analysis",
+    "verdict": "Final Verdict",
+    "vote": "Vote",
+}
+
+# Badge class + emoji per vote value; one dict probe instead of a branch chain.
+_VOTE_STYLE = {
+    "APPROVE": ("vote-approve", "✅"),
+    "REJECT": ("vote-reject", "❌"),
+    "NOT POLLED": ("vote-skipped", "⏭️"),
+}
+_VOTE_STYLE_DEFAULT = ("vote-revision", "🔄")
+
+# Pulls http(s) URLs out of the URL text area in one C-level scan.
+_URL_RE = re.compile(r"https?://\S+")
+
+# Escape HTML specials and convert newlines to <br> in a single pass.
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+    "\n": "<br>",
+})
+
+# Step-card HTML, compiled once; render_step fills it with format_map.
+_STEP_CARD_TMPL = """<div class="agent-card" style="border-color:{color}">
+        <strong style="color:{color}">{icon} {name}</strong>
+        &nbsp;·&nbsp;<em>{step_label}</em>
+        &nbsp;·&nbsp;<small style="opacity:0.7">{provider_name} / {model}</small>
+        </div>"""
+
+
+@functools.lru_cache(maxsize=32)
+def _provider_name(pid: str) -> str:
+    return PROVIDERS.get(pid, {}).get("name", pid)
+
+
+# API keys come from the environment and don't change mid-process, so the
+# configured check can be resolved once per provider instead of per rerun.
+_is_configured = functools.lru_cache(maxsize=32)(is_provider_configured)
+
+
+@st.cache_data(show_spinner=False)
+def _sidebar_row_html(name: str, role_label: str, provider_name: str,
+                      model: str, color: str, icon: str) -> str:
+    """Markdown for one council-member row; agents don't change mid-debate,
+    so the string is memoized across the rerun storm a live debate causes."""
+    return (
+        f"<span style='color:{color}'>{icon}</span> "
+        f"**{name}**  \n"
+        f"<small>{role_label} · {provider_name} · {model}</small>"
+    )
+
+
+@st.cache_resource
+def _inject_css() -> None:
+    """Send the CSS block to the front end once per process, not per rerun."""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+
+_inject_css()
 
 # ---------------------------------------------------------------------------
 # Sidebar — Agent management & rate limit stats
@@ -93,26 +165,29 @@ with st.sidebar:
 
     # --- Current agents ---
     st.subheader("🤖 Council Members")
-    agents_to_remove = []
     for i, agent in enumerate(st.session_state.agents):
         col1, col2 = st.columns([4, 1])
         with col1:
             role_cfg = ROLES.get(agent.role, {})
             st.markdown(
-                f"<span style='color:{agent.color}'>{agent.icon}</span> "
-                f"**{agent.name}**  \n"
-                f"<small>{role_cfg.get('label', agent.role)} · "
-                f"{PROVIDERS.get(agent.provider, {}).get('name', agent.provider)} · "
-                f"{agent.model}</small>",
+                _sidebar_row_html(
+                    agent.name,
+                    role_cfg.get("label", agent.role),
+                    _provider_name(agent.provider),
+                    agent.model,
+                    agent.color,
+                    agent.icon,
+                ),
                 unsafe_allow_html=True,
             )
         with col2:
+            # At most one remove button fires per rerun (st.rerun ends the
+            # script), so filter and rerun directly — no pending-removal list.
             if st.button("✕", key=f"remove_{agent.id}", help="Remove agent"):
-                agents_to_remove.append(agent.id)
-
-    for aid in agents_to_remove:
-        st.session_state.agents = [a for a in st.session_state.agents if a.id != aid]
-        st.rerun()
+                st.session_state.agents = [
+                    a for a in st.session_state.agents if a.id != agent.id
+                ]
+                st.rerun()
 
     # --- Add new agent ---
     st.divider()
@@ -150,12 +225,16 @@ with st.sidebar:
     st.divider()
     st.subheader("📊 Rate Limit Usage")
     registry = get_registry()
-    for stat in registry.all_stats():
+    # Snapshot once per rerun and render from local data, so the render loop
+    # doesn't keep re-entering the registry's locks mid-debate.
+    stats = list(registry.all_stats())
+    configured_map = {s["provider"]: _is_configured(s["provider"]) for s in stats}
+    for stat in stats:
         pid = stat["provider"]
-        pname = PROVIDERS.get(pid, {}).get("name", pid)
+        pname = _provider_name(pid)
         rpm_pct = stat["rpm_used"] / stat["rpm_limit"] if stat["rpm_limit"] else 0
         rpd_pct = stat["rpd_used"] / stat["rpd_limit"] if stat["rpd_limit"] else 0
-        configured = is_provider_configured(pid)
+        configured = configured_map[pid]
         status = "🟢" if (stat["available"] and configured) else ("🔴" if not configured else "🟡")
         with st.expander(f"{status} {pname}", expanded=False):
             st.progress(min(rpm_pct, 1.0), text=f"RPM: {stat['rpm_used']}/{stat['rpm_limit']}")
@@ -199,22 +278,44 @@ with col_btn:
     st.write("")  # spacer
     st.write("")
     submit = st.button("🚀 Debate!", type="primary", disabled=st.session_state.debate_running)
+    fast_consensus = st.toggle(
+        "⚡ Fast consensus",
+        value=False,
+        help="Skip the revision rounds when the reviewers approve the first proposal outright.",
+        key="fast_consensus",
+    )
 
 # ---------------------------------------------------------------------------
 # Build context from uploads
 # ---------------------------------------------------------------------------
+@st.cache_data(show_spinner=False)
+def _extract(name: str, data: bytes) -> str:
+    """Cached wrapper so re-debates don't re-parse unchanged uploads."""
+    return extract_text_from_file(name, data)
+
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _fetch_url(url: str) -> str:
+    """Cached wrapper so re-debates over the same URL skip the re-fetch."""
+    return fetch_url_content(url)
+
+
 def build_context() -> str:
     file_data = []
     if uploaded_files:
         for f in uploaded_files:
             try:
-                text = extract_text_from_file(f.name, f.read())
+                # getvalue() doesn't exhaust the UploadedFile stream the way
+                # read() does, and gives st.cache_data a hashable key.
+                text = _extract(f.name, f.getvalue())
                 file_data.append({"name": f.name, "text": text})
             except Exception as exc:
                 st.warning(f"Could not read '{f.name}': {exc}")
 
-    urls = [u.strip() for u in (url_input or "").splitlines() if u.strip()]
-    return format_context(file_data, urls)
+    # Single regex scan instead of a Python-level splitlines/strip loop;
+    # dict.fromkeys dedupes while preserving order so no URL is fetched twice.
+    urls = list(dict.fromkeys(_URL_RE.findall(url_input or "")))
+    return format_context(file_data, urls, fetcher=_fetch_url)
 
 
 # ---------------------------------------------------------------------------
@@ -222,25 +323,17 @@ def build_context() -> str:
 # ---------------------------------------------------------------------------
 def render_step(step: DebateStep) -> None:
     agent = step.agent
-    role_cfg = ROLES.get(agent.role, {})
-    step_labels = {
-        "proposal": "Initial Proposal",
-        "critique": "Critique",
-        "revision": "Revision",
-        "re-evaluation": "Re-evaluation",
-        "specialist": "Analysis",
-        "verdict": "Final Verdict",
-        "vote": "Vote",
-    }
-    step_label = step_labels.get(step.step_type, step.step_type.title())
-    provider_name = PROVIDERS.get(step.used_provider, {}).get("name", step.used_provider)
+    step_label = _STEP_LABELS.get(step.step_type, step.step_type.title())
 
     st.markdown(
-        f"""<div class="agent-card" style="border-color:{agent.color}">
-        <strong style="color:{agent.color}">{agent.icon} {agent.name}</strong>
-        &nbsp;·&nbsp;<em>{step_label}</em>
-        &nbsp;·&nbsp;<small style="opacity:0.7">{provider_name} / {step.used_model}</small>
-        </div>""",
+        _STEP_CARD_TMPL.format_map({
+            "color": agent.color,
+            "icon": agent.icon,
+            "name": agent.name,
+            "step_label": step_label,
+            "provider_name": _provider_name(step.used_provider),
+            "model": step.used_model,
+        }),
         unsafe_allow_html=True,
     )
     st.markdown(step.content)
@@ -262,15 +355,13 @@ if submit:
 
         context_text = build_context()
 
-        debate_placeholder = st.empty()
-        steps_so_far: list[DebateStep] = []
+        st.subheader("🗣️ Debate in Progress…")
+        debate_container = st.container()
 
         def on_step_callback(step: DebateStep) -> None:
-            steps_so_far.append(step)
-            with debate_placeholder.container():
-                st.subheader("🗣️ Debate in Progress…")
-                for s in steps_so_far:
-                    render_step(s)
+            # Append only the newly arrived step — earlier steps stay rendered.
+            with debate_container:
+                render_step(step)
 
         fallback_warnings: list[str] = []
 
@@ -288,6 +379,7 @@ if submit:
                 context_text=context_text,
                 on_step=on_step_callback,
                 on_fallback=on_fallback_callback,
+                fast_consensus=fast_consensus,
             )
             st.session_state.debate_result = result
         except Exception as exc:
@@ -316,20 +408,13 @@ if st.session_state.debate_result and not st.session_state.debate_running:
     vote_cols = st.columns(len(result["votes"]))
     for col, vote in zip(vote_cols, result["votes"]):
         agent_vote = vote["vote"]
-        if agent_vote == "APPROVE":
-            badge_cls = "vote-approve"
-            emoji = "✅"
-        elif agent_vote == "REJECT":
-            badge_cls = "vote-reject"
-            emoji = "❌"
-        else:
-            badge_cls = "vote-revision"
-            emoji = "🔄"
+        badge_cls, emoji = _VOTE_STYLE.get(agent_vote, _VOTE_STYLE_DEFAULT)
 
         role_cfg = ROLES.get(vote["role"], {})
+        safe_name = vote["agent_name"].translate(_HTML_ESCAPE_TABLE)
         with col:
             st.markdown(
-                f"**{role_cfg.get('icon','🤖')} {vote['agent_name']}**  \n"
+                f"**{role_cfg.get('icon','🤖')} {safe_name}**  \n"
                 f"<span class='vote-badge {badge_cls}'>{emoji} {agent_vote}</span>",
                 unsafe_allow_html=True,
             )
@@ -339,7 +424,7 @@ if st.session_state.debate_result and not st.session_state.debate_running:
     st.markdown(f"**Tally:** {result['vote_summary']}")
 
     # --- Final council decision ---
-    safe_answer = html.escape(result["final_answer"]).replace("\n", "<br>")
+    safe_answer = result["final_answer"].translate(_HTML_ESCAPE_TABLE)
     if result["approved"]:
         st.markdown(
             f"""<div class="council-approved">
@@ -2,142 +2,191 @@
 config.py — Default agent configurations, provider configs, and constants.
 """
 
+from dataclasses import dataclass
+
+
+class _MappingShim:
+    """Dict-style access (`cfg["name"]`, `cfg.get(...)`) for the frozen
+    config dataclasses, so existing mapping-style call sites keep working.
+    Attribute access (`cfg.name`) is the fast path."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderCfg(_MappingShim):
+    """How to call one LLM provider's API."""
+    name: str
+    type: str
+    env_key: str
+    default_model: str
+    models: tuple[str, ...]
+    rate_limit_rpm: int
+    rate_limit_rpd: int
+    base_url: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class RoleCfg(_MappingShim):
+    """Display styling and persona for one agent role."""
+    label: str
+    color: str
+    icon: str
+    system_prompt: str
+
+
 # ---------------------------------------------------------------------------
 # Provider definitions
 # Each provider entry describes how to call the API.
 # ---------------------------------------------------------------------------
-PROVIDERS = {
-    "groq": {
-        "name": "Groq",
-        "type": "openai_compatible",
-        "base_url": "https://api.groq.com/openai/v1",
-        "env_key": "GROQ_API_KEY",
-        "default_model": "llama-3.3-70b-versatile",
-        "models": [
+PROVIDERS: dict[str, ProviderCfg] = {
+    "groq": ProviderCfg(
+        name="Groq",
+        type="openai_compatible",
+        base_url="https://api.groq.com/openai/v1",
+        env_key="GROQ_API_KEY",
+        default_model="llama-3.3-70b-versatile",
+        models=(
             "llama-3.3-70b-versatile",
             "llama-3.1-8b-instant",
             "mixtral-8x7b-32768",
             "gemma2-9b-it",
-        ],
+        ),
         # Free-tier rate limits (approximate)
-        "rate_limit_rpm": 30,
-        "rate_limit_rpd": 14400,
-    },
-    "google": {
-        "name": "Google AI Studio",
-        "type": "google",
-        "base_url": "https://generativelanguage.googleapis.com/v1beta/models",
-        "env_key": "GOOGLE_API_KEY",
-        "default_model": "gemini-2.0-flash",
-        "models": [
+        rate_limit_rpm=30,
+        rate_limit_rpd=14400,
+    ),
+    "google": ProviderCfg(
+        name="Google AI Studio",
+        type="google",
+        base_url="https://generativelanguage.googleapis.com/v1beta/models",
+        env_key="GOOGLE_API_KEY",
+        default_model="gemini-2.0-flash",
+        models=(
             "gemini-2.0-flash",
             "gemini-1.5-flash",
             "gemini-1.5-pro",
-        ],
-        "rate_limit_rpm": 15,
-        "rate_limit_rpd": 1500,
-    },
-    "openrouter": {
-        "name": "OpenRouter",
-        "type": "openai_compatible",
-        "base_url": "https://openrouter.ai/api/v1",
-        "env_key": "OPENROUTER_API_KEY",
-        "default_model": "mistralai/mistral-7b-instruct:free",
-        "models": [
+        ),
+        rate_limit_rpm=15,
+        rate_limit_rpd=1500,
+    ),
+    "openrouter": ProviderCfg(
+        name="OpenRouter",
+        type="openai_compatible",
+        base_url="https://openrouter.ai/api/v1",
+        env_key="OPENROUTER_API_KEY",
+        default_model="mistralai/mistral-7b-instruct:free",
+        models=(
             "mistralai/mistral-7b-instruct:free",
             "meta-llama/llama-3.2-3b-instruct:free",
             "google/gemma-3-4b-it:free",
             "deepseek/deepseek-r1:free",
-        ],
-        "rate_limit_rpm": 20,
-        "rate_limit_rpd": 200,
-    },
-    "cerebras": {
-        "name": "Cerebras",
-        "type": "openai_compatible",
-        "base_url": "https://api.cerebras.ai/v1",
-        "env_key": "CEREBRAS_API_KEY",
-        "default_model": "llama3.1-70b",
-        "models": [
+        ),
+        rate_limit_rpm=20,
+        rate_limit_rpd=200,
+    ),
+    "cerebras": ProviderCfg(
+        name="Cerebras",
+        type="openai_compatible",
+        base_url="https://api.cerebras.ai/v1",
+        env_key="CEREBRAS_API_KEY",
+        default_model="llama3.1-70b",
+        models=(
             "llama3.1-70b",
             "llama3.1-8b",
-        ],
-        "rate_limit_rpm": 30,
-        "rate_limit_rpd": 1000,
-    },
-    "cohere": {
-        "name": "Cohere",
-        "type": "cohere",
-        "env_key": "COHERE_API_KEY",
-        "default_model": "command-r-plus",
-        "models": [
+        ),
+        rate_limit_rpm=30,
+        rate_limit_rpd=1000,
+    ),
+    "cohere": ProviderCfg(
+        name="Cohere",
+        type="cohere",
+        env_key="COHERE_API_KEY",
+        default_model="command-r-plus",
+        models=(
             "command-r-plus",
             "command-r",
             "command",
-        ],
-        "rate_limit_rpm": 20,
-        "rate_limit_rpd": 1000,
-    },
+        ),
+        rate_limit_rpm=20,
+        rate_limit_rpd=1000,
+    ),
 }
 
 # ---------------------------------------------------------------------------
 # Agent role definitions
 # ---------------------------------------------------------------------------
-ROLES = {
-    "thinker": {
-        "label": "Thinker",
-        "color": "#28a745",      # green
-        "icon": "💡",
-        "system_prompt": (
-            "You are a creative and analytical thinker. Your job is to propose "
-            "thoughtful, well-reasoned solutions to the question. Be specific, "
-            "practical, and clear. Structure your answer with clear headings "
-            "when appropriate."
+ROLES: dict[str, RoleCfg] = {
+    "thinker": RoleCfg(
+        label="Thinker",
+        color="#28a745",      # green
+        icon="💡",
+        system_prompt=(
+            "You are a creative and analytical thinker. Propose thoughtful, "
+            "well-reasoned solutions. Be specific, practical, and clear; use "
+            "headings when helpful."
         ),
-    },
-    "critic": {
-        "label": "Critic",
-        "color": "#ffc107",      # yellow/amber
-        "icon": "🔍",
-        "system_prompt": (
-            "You are a rigorous critic and challenger. Your job is to find flaws, "
-            "weaknesses, and oversights in proposed solutions. Propose better "
-            "alternatives where possible. Be constructive but direct."
+    ),
+    "critic": RoleCfg(
+        label="Critic",
+        color="#ffc107",      # yellow/amber
+        icon="🔍",
+        system_prompt=(
+            "You are a rigorous critic. Find flaws, weaknesses, and oversights "
+            "in proposed solutions; suggest better alternatives. Be "
+            "constructive but direct."
         ),
-    },
-    "judge": {
-        "label": "Judge",
-        "color": "#6f42c1",      # purple
-        "icon": "⚖️",
-        "system_prompt": (
-            "You are an impartial judge reviewing a debate. Analyse both sides "
-            "fairly. Score each participant 1–10, declare a winner or consensus, "
-            "and give a concise final verdict with the best answer synthesised "
-            "from the debate."
+    ),
+    "judge": RoleCfg(
+        label="Judge",
+        color="#6f42c1",      # purple
+        icon="⚖️",
+        system_prompt=(
+            "You are an impartial judge. Weigh both sides fairly, score each "
+            "participant 1–10, declare a winner or consensus, and give a "
+            "concise final verdict synthesising the best answer."
         ),
-    },
-    "researcher": {
-        "label": "Researcher",
-        "color": "#17a2b8",      # teal
-        "icon": "🔬",
-        "system_prompt": (
-            "You are a thorough researcher. Your job is to provide relevant "
-            "background information, cite known facts, and surface edge cases "
-            "or considerations that others may have missed."
+    ),
+    "researcher": RoleCfg(
+        label="Researcher",
+        color="#17a2b8",      # teal
+        icon="🔬",
+        system_prompt=(
+            "You are a thorough researcher. Provide relevant background, cite "
+            "known facts, and surface edge cases others may have missed."
         ),
-    },
-    "security_auditor": {
-        "label": "Security Auditor",
-        "color": "#dc3545",      # red
-        "icon": "🛡️",
-        "system_prompt": (
-            "You are a security auditor. Analyse proposed solutions for security "
-            "vulnerabilities, privacy concerns, and potential abuse vectors. "
-            "Suggest mitigations for any issues you find."
+    ),
+    "security_auditor": RoleCfg(
+        label="Security Auditor",
+        color="#dc3545",      # red
+        icon="🛡️",
+        system_prompt=(
+            "You are a security auditor. Flag vulnerabilities, privacy "
+            "concerns, and abuse vectors in proposed solutions, with "
+            "mitigations."
         ),
-    },
+    ),
 }
 
+UNKNOWN_ROLE = RoleCfg(
+    label="Unknown",
+    color="#888888",
+    icon="🤖",
+    system_prompt="You are a helpful assistant.",
+)
+
 # ---------------------------------------------------------------------------
 # Default council configuration
 # ---------------------------------------------------------------------------
@@ -168,6 +217,9 @@ DEFAULT_AGENTS = [
 # Debate settings
 MAX_REVISION_ROUNDS = 2
 VOTE_OPTIONS = ["APPROVE", "REJECT", "NEEDS REVISION"]
+# Fraction of early reviewers that must approve a proposal outright for the
+# fast-consensus path to skip the revision/re-evaluation phases.
+EARLY_APPROVE_THRESHOLD = 1.0
 
 # File upload settings
 MAX_FILE_SIZE_MB = 10
@@ -12,40 +12,135 @@ The debate flow:
      - Otherwise → revision round (up to MAX_REVISION_ROUNDS extra rounds)
 """
 
+import asyncio
+import json
 import re
 from typing import Callable, Optional
 
-from config import MAX_REVISION_ROUNDS, VOTE_OPTIONS, PROVIDERS
-from agents import Agent, build_messages, build_vote_messages
-from providers import chat
-from rate_limiter import get_registry
+import httpx
+from tenacity import (retry, retry_if_exception, stop_after_attempt,
+                      wait_random_exponential)
+
+from config import (MAX_REVISION_ROUNDS, VOTE_OPTIONS, PROVIDERS,
+                    EARLY_APPROVE_THRESHOLD)
+from agents import (Agent, build_messages_incremental, build_vote_messages,
+                    build_batch_vote_messages)
+from providers import achat, achat_stream, aclose_async_clients
+from rate_limiter import get_registry, ProviderRateLimitedError
 
 
 # ---------------------------------------------------------------------------
 # Internal helper
 # ---------------------------------------------------------------------------
 
-def _call_agent(agent: Agent, messages: list[dict],
-                on_fallback: Optional[Callable[[str, str], None]] = None) -> str:
+def _is_transient(exc: BaseException) -> bool:
+    """Retry only what a retry can fix: transport hiccups, 429s, and 5xx."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return False
+
+
+_BACKOFF = wait_random_exponential(min=1, max=30)
+
+
+def _wait_transient(retry_state) -> float:
+    """Exponential backoff with full jitter, seeded by the server's
+    Retry-After header when one was sent."""
+    wait = _BACKOFF(retry_state)
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                wait = max(wait, float(retry_after))
+            except ValueError:
+                pass
+    return wait
+
+
+@retry(wait=_wait_transient, stop=stop_after_attempt(4),
+       retry=retry_if_exception(_is_transient), reraise=True)
+async def _chat_with_retry(provider: str, messages: list[dict], model: str,
+                           **kwargs) -> str:
+    return await achat(provider, messages, model, **kwargs)
+
+
+# How many streamed chunks to accumulate before flushing a partial step to
+# the caller — per-token flushes would rerun the UI callback thousands of
+# times per reply.
+_STREAM_FLUSH_CHUNKS = 64
+
+
+@retry(wait=_wait_transient, stop=stop_after_attempt(4),
+       retry=retry_if_exception(_is_transient), reraise=True)
+async def _stream_with_retry(provider: str, messages: list[dict], model: str,
+                             on_chunk: Callable[[str], None],
+                             **kwargs) -> str:
+    parts: list[str] = []
+    async for chunk in achat_stream(provider, messages, model, **kwargs):
+        parts.append(chunk)
+        if len(parts) % _STREAM_FLUSH_CHUNKS == 0:
+            on_chunk("".join(parts))
+    return "".join(parts)
+
+
+async def _call_agent(agent: Agent, messages: list[dict],
+                      on_fallback: Optional[Callable[[str, str], None]] = None,
+                      on_chunk: Optional[Callable[[str], None]] = None) -> str:
     """
     Call the agent's provider, falling back to another provider if rate-limited.
-    Records the request in the rate limiter.
+    The registry's acquire() gate throttles concurrent fan-out below the
+    provider's rpm budget and records the request; transient failures are
+    retried with jittered backoff, and repeated failures open the provider's
+    circuit breaker so the next calls fall back instead of re-waking it.
     """
     registry = get_registry()
     provider = agent.provider
     model = agent.model
 
-    if not registry.can_request(provider):
-        fallback = registry.find_available_fallback(provider)
-        if fallback is None:
-            raise RuntimeError("All providers are currently rate-limited. Please wait.")
-        if on_fallback:
-            on_fallback(provider, fallback)
-        provider = fallback
-        model = PROVIDERS[fallback]["default_model"]
+    # The pre-check below is advisory: with concurrent fan-out another
+    # coroutine can fill the window between it and acquire(), which then
+    # raises ProviderRateLimitedError — handled by moving to a fallback
+    # instead of aborting the whole phase. `denied` tracks providers whose
+    # admission failed despite an open-looking window so they aren't
+    # retried; the loop is bounded by the provider count.
+    denied: set[str] = set()
+    for _ in range(len(PROVIDERS)):
+        if provider in denied or not registry.can_request(provider):
+            fallback = registry.find_available_fallback(provider, exclude=denied)
+            if fallback is None:
+                break
+            if on_fallback:
+                on_fallback(provider, fallback)
+            provider = fallback
+            model = PROVIDERS[fallback].default_model
 
-    registry.record_request(provider)
-    return chat(provider, messages, model)
+        try:
+            async with registry.acquire(provider):
+                try:
+                    # The cache key pins all of one agent's calls to the same
+                    # provider-side prompt-cache shard (used by
+                    # OpenAI-compatible backends; others ignore it).
+                    if on_chunk is not None:
+                        content = await _stream_with_retry(
+                            provider, messages, model, on_chunk,
+                            prompt_cache_key=agent.id)
+                    else:
+                        content = await _chat_with_retry(
+                            provider, messages, model,
+                            prompt_cache_key=agent.id)
+                except Exception:
+                    registry.record_failure(provider)
+                    raise
+                registry.record_success(provider)
+                return content
+        except ProviderRateLimitedError:
+            denied.add(provider)
+
+    raise RuntimeError("All providers are currently rate-limited. Please wait.")
 
 
 # ---------------------------------------------------------------------------
@@ -85,12 +180,28 @@ def run_debate(
     context_text: str = "",
     on_step: Optional[Callable[[DebateStep], None]] = None,
     on_fallback: Optional[Callable[[str, str], None]] = None,
+    fast_consensus: bool = False,
+    on_token: Optional[Callable[[DebateStep], None]] = None,
 ) -> dict:
     """
-    Orchestrate the full AI Council debate.
-
-    `on_step` is called after each DebateStep so callers (e.g. Streamlit)
-    can stream results progressively.
+    Orchestrate the full AI Council debate (synchronous entry point).
+
+    The debate runs on an event loop internally — within each phase the
+    agents' provider calls only depend on the previous phase's history, so
+    they are dispatched concurrently and phase latency is the slowest call
+    rather than the sum. `on_step` is called after each DebateStep so
+    callers (e.g. Streamlit) can stream results progressively. When
+    `on_token` is given, providers that support streaming additionally call
+    it with the in-flight DebateStep as its `content` grows (every
+    ~_STREAM_FLUSH_CHUNKS streamed chunks), so partial replies can be
+    rendered before the step completes; the same step object is later
+    passed to `on_step` with the full content.
+
+    With `fast_consensus`, the reviewers (critics and judges) cast a quick
+    vote on the initial proposal right after the critique phase; if at least
+    EARLY_APPROVE_THRESHOLD of them approve outright, the revision and
+    re-evaluation phases are skipped — fewer LLM round trips on easy
+    questions.
 
     Returns a result dict with keys:
         steps         — list of all DebateStep objects
@@ -100,9 +211,44 @@ def run_debate(
         approved      — bool
         vote_summary  — human-readable tally
     """
+    async def _runner() -> dict:
+        try:
+            return await _run_debate_async(
+                question=question,
+                agents=agents,
+                context_text=context_text,
+                on_step=on_step,
+                on_fallback=on_fallback,
+                fast_consensus=fast_consensus,
+                on_token=on_token,
+            )
+        finally:
+            # This loop dies with asyncio.run — release the connection pools
+            # bound to it instead of stranding their sockets.
+            await aclose_async_clients()
+
+    return asyncio.run(_runner())
+
+
+async def _run_debate_async(
+    question: str,
+    agents: list[Agent],
+    context_text: str = "",
+    on_step: Optional[Callable[[DebateStep], None]] = None,
+    on_fallback: Optional[Callable[[str, str], None]] = None,
+    fast_consensus: bool = False,
+    on_token: Optional[Callable[[DebateStep], None]] = None,
+) -> dict:
     history: list[dict] = []
     steps: list[DebateStep] = []
 
+    # Per-agent message caches for build_messages_incremental: each agent's
+    # prefix (system prompt, context, question) is serialized once and only
+    # new history entries are appended per phase. This also subsumes the old
+    # send-context-once bookkeeping — the attached context enters an agent's
+    # cached prefix exactly once by construction.
+    msg_cache: dict[str, list] = {}
+
     # Partition agents by role
     thinkers = [a for a in agents if a.role == "thinker"]
     critics  = [a for a in agents if a.role == "critic"]
@@ -123,48 +269,83 @@ def run_debate(
         if on_step:
             on_step(step)
 
-    def _run_agent(agent: Agent, step_type: str) -> DebateStep:
-        msgs = build_messages(agent, history, question, context_text or None)
-        content = _call_agent(agent, msgs, on_fallback)
-        return DebateStep(agent, step_type, content)
+    async def _run_agent(agent: Agent, step_type: str,
+                         extra_prompt: Optional[str] = None) -> DebateStep:
+        msgs = build_messages_incremental(agent, history, question, msg_cache,
+                                          context_text or None,
+                                          extra_prompt=extra_prompt)
+        if on_token is None:
+            content = await _call_agent(agent, msgs, on_fallback)
+            return DebateStep(agent, step_type, content)
+
+        # Streaming path: flush the in-flight step with partial content so
+        # the caller can render the reply as it is generated.
+        step = DebateStep(agent, step_type, "")
+
+        def _flush(partial: str) -> None:
+            step.content = partial
+            on_token(step)
+
+        step.content = await _call_agent(agent, msgs, on_fallback,
+                                         on_chunk=_flush)
+        return step
+
+    async def _run_phase(group: list[Agent], step_type: str) -> list[DebateStep]:
+        """Dispatch one phase's agents concurrently; emit serially so the
+        shared history keeps a deterministic order."""
+        results = await asyncio.gather(*(_run_agent(a, step_type) for a in group))
+        for step in results:
+            emit(step)
+        return results
 
     # ------------------------------------------------------------------
     # Phase 1: Thinkers propose
     # ------------------------------------------------------------------
-    for thinker in thinkers:
-        emit(_run_agent(thinker, "proposal"))
+    await _run_phase(thinkers, "proposal")
 
     # ------------------------------------------------------------------
     # Phase 2: Critics critique
     # ------------------------------------------------------------------
-    for critic in critics:
-        emit(_run_agent(critic, "critique"))
-
-    # ------------------------------------------------------------------
-    # Phase 3: Thinkers revise
-    # ------------------------------------------------------------------
-    for thinker in thinkers:
-        emit(_run_agent(thinker, "revision"))
+    await _run_phase(critics, "critique")
 
     # ------------------------------------------------------------------
-    # Phase 4: Critics re-evaluate
+    # Optional fast-consensus check: if the reviewers already approve the
+    # proposal outright, the revision phases are wasted round trips.
     # ------------------------------------------------------------------
-    for critic in critics:
-        emit(_run_agent(critic, "re-evaluation"))
+    skip_revision = False
+    if fast_consensus:
+        reviewers = [a for a in critics + judges if a not in thinkers]
+        proposal = next((s for s in steps if s.step_type == "proposal"), None)
+        if reviewers and proposal is not None:
+            # The threshold is a ratio over all reviewers, so every vote is
+            # needed — no majority short-circuit here.
+            early_votes = await _collect_votes(reviewers, question,
+                                               proposal.content, on_fallback,
+                                               short_circuit=False)
+            approve = sum(1 for v in early_votes if v["vote"] == "APPROVE")
+            skip_revision = approve / len(early_votes) >= EARLY_APPROVE_THRESHOLD
+
+    if not skip_revision:
+        # --------------------------------------------------------------
+        # Phase 3: Thinkers revise
+        # --------------------------------------------------------------
+        await _run_phase(thinkers, "revision")
+
+        # --------------------------------------------------------------
+        # Phase 4: Critics re-evaluate
+        # --------------------------------------------------------------
+        await _run_phase(critics, "re-evaluation")
 
     # ------------------------------------------------------------------
     # Phase 5: Other specialist agents (researcher, security_auditor, etc.)
     # ------------------------------------------------------------------
-    for agent in others:
-        emit(_run_agent(agent, "specialist"))
+    await _run_phase(others, "specialist")
 
     # ------------------------------------------------------------------
     # Phase 6: Judges give verdict
     # ------------------------------------------------------------------
     final_answer = ""
-    for judge in judges:
-        step = _run_agent(judge, "verdict")
-        emit(step)
+    for step in await _run_phase(judges, "verdict"):
         final_answer = step.content  # last judge wins
 
     # ------------------------------------------------------------------
@@ -174,8 +355,8 @@ def run_debate(
     revision_rounds = 0
 
     while True:
-        votes = _collect_votes(agents, question, final_answer, on_fallback)
-        approved, summary = _tally_votes(votes)
+        votes = await _collect_votes(agents, question, final_answer, on_fallback)
+        approved, vote_summary = _tally_votes(votes)
 
         if approved or revision_rounds >= MAX_REVISION_ROUNDS:
             break
@@ -184,25 +365,23 @@ def run_debate(
         revision_rounds += 1
 
         # Ask thinkers to revise once more
-        for thinker in thinkers:
-            extra_prompt = (
-                f"The council voted: {summary}. "
-                "Please revise your solution to address the concerns raised."
-            )
-            msgs = build_messages(thinker, history, question + "\n\n" + extra_prompt,
-                                  context_text or None)
-            content = _call_agent(thinker, msgs, on_fallback)
-            step = DebateStep(thinker, "revision", content)
+        extra_prompt = (
+            f"The council voted: {vote_summary}. "
+            "Please revise your solution to address the concerns raised."
+        )
+
+        # The question stays byte-identical to earlier rounds; the vote
+        # feedback rides in the dynamic section after the cache boundary.
+        for step in await asyncio.gather(
+                *(_run_agent(t, "revision", extra_prompt) for t in thinkers)):
             emit(step)
 
         # Ask judges to re-assess
-        for judge in judges:
-            step = _run_agent(judge, "verdict")
-            emit(step)
+        for step in await _run_phase(judges, "verdict"):
             final_answer = step.content
 
-    approved, vote_summary = _tally_votes(votes)
-
+    # approved/vote_summary were computed for this vote set inside the loop;
+    # no need to re-tally on the way out.
     return {
         "steps": steps,
         "history": history,
@@ -213,45 +392,168 @@ def run_debate(
     }
 
 
-def _collect_votes(agents: list[Agent], question: str,
-                   final_answer: str,
-                   on_fallback: Optional[Callable] = None) -> list[dict]:
-    votes = []
-    for agent in agents:
+async def _collect_votes(agents: list[Agent], question: str,
+                         final_answer: str,
+                         on_fallback: Optional[Callable] = None,
+                         short_circuit: bool = True) -> list[dict]:
+    """Collect one vote per agent (batched per provider/model group).
+
+    With `short_circuit`, collection stops as soon as the majority outcome
+    is arithmetically settled — either APPROVE has crossed half the council
+    or can no longer reach it — and the not-yet-finished vote calls are
+    cancelled. Agents whose calls were skipped still appear in the result
+    with an explicit "NOT POLLED" vote, so the returned list always covers
+    the full council and tallies over its real size. Callers that need
+    every individual vote (e.g. the unanimity check in fast consensus) pass
+    short_circuit=False.
+    """
+    async def _vote(agent: Agent) -> dict:
         msgs = build_vote_messages(agent, question, final_answer)
         try:
-            raw = _call_agent(agent, msgs, on_fallback)
+            raw = await _call_agent(agent, msgs, on_fallback)
         except Exception as exc:  # noqa: BLE001
             # Agent unreachable: cast a neutral vote so it doesn't sway consensus
             raw = f"NEEDS REVISION\n(Agent unavailable: {exc})"
 
         vote_value, reason = _parse_vote(raw)
-        votes.append({
+        return {
             "agent_id": agent.id,
             "agent_name": agent.name,
             "role": agent.role,
             "vote": vote_value,
             "reason": reason,
             "raw": raw,
-        })
-    return votes
+        }
+
+    async def _vote_group(group: list[Agent]) -> list[dict]:
+        if len(group) == 1:
+            return [await _vote(group[0])]
+        # Same provider/model: one batched call instead of len(group) calls.
+        msgs = build_batch_vote_messages(group, question, final_answer)
+        try:
+            raw = await _call_agent(group[0], msgs, on_fallback)
+            parsed = _parse_batch_votes(raw, group)
+        except Exception:  # noqa: BLE001
+            parsed = None
+        if parsed is not None:
+            return parsed
+        # Malformed batch output — fall back to one call per agent.
+        return list(await asyncio.gather(*(_vote(a) for a in group)))
+
+    # Agents sharing a (provider, model) vote on the same final answer, so
+    # their votes can be collected in a single batched prompt per group.
+    groups: dict[tuple[str, str], list[Agent]] = {}
+    for agent in agents:
+        groups.setdefault((agent.provider, agent.model), []).append(agent)
+
+    total = len(agents)
+
+    def _settled(approve: int, cast: int) -> bool:
+        # Majority reached, or unreachable even if every pending vote approves.
+        return 2 * approve > total or 2 * (approve + total - cast) <= total
+
+    tasks = [asyncio.ensure_future(_vote_group(g)) for g in groups.values()]
+    by_id: dict[str, dict] = {}
+    approve = 0
+    try:
+        for fut in asyncio.as_completed(tasks):
+            for v in await fut:
+                by_id[v["agent_id"]] = v
+                if v["vote"] == "APPROVE":
+                    approve += 1
+            if short_circuit and _settled(approve, len(by_id)):
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Groups that finished before the break cast real (already paid-for)
+        # votes — drain them so their members aren't misreported as
+        # NOT POLLED; only calls that were actually cancelled stay uncast.
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception() is None:
+                for v in task.result():
+                    by_id.setdefault(v["agent_id"], v)
+
+    return [
+        by_id.get(a.id) or {
+            "agent_id": a.id,
+            "agent_name": a.name,
+            "role": a.role,
+            "vote": "NOT POLLED",
+            "reason": "Outcome was already decided before this vote was needed.",
+            "raw": "",
+        }
+        for a in agents
+    ]
+
+
+def _parse_batch_votes(raw: str, group: list[Agent]) -> Optional[list[dict]]:
+    """Parse the JSON array a batched vote prompt asks for. Returns None if
+    the output is malformed or any group member's vote is missing, so the
+    caller can fall back to per-agent calls."""
+    start = raw.find("[")
+    end = raw.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        entries = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(entries, list):
+        return None
+
+    by_id: dict[str, tuple[str, str]] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        vote_value = str(entry.get("vote", "")).strip().upper()
+        if vote_value in VOTE_OPTIONS:
+            by_id[str(entry.get("agent_id", ""))] = (
+                vote_value, str(entry.get("reason", "")).strip())
+
+    if any(agent.id not in by_id for agent in group):
+        return None
+
+    return [{
+        "agent_id": agent.id,
+        "agent_name": agent.name,
+        "role": agent.role,
+        "vote": by_id[agent.id][0],
+        "reason": by_id[agent.id][1],
+        "raw": raw,
+    } for agent in group]
+
+
+# One anchored alternation replaces the per-option scans in _parse_vote.
+# Longest options first so "NEEDS REVISION" wins over a hypothetical prefix.
+_VOTE_RE = re.compile(
+    r"\s*\W{0,3}(" + "|".join(
+        re.escape(o) for o in sorted(VOTE_OPTIONS, key=len, reverse=True)
+    ) + r")\b\W{0,3}(.*)",
+    re.IGNORECASE | re.DOTALL,
+)
 
 
 def _parse_vote(text: str) -> tuple[str, str]:
     """Extract the vote keyword and the reason from the agent's reply."""
-    text = text.strip()
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-
-    for option in VOTE_OPTIONS:
-        if lines and option in lines[0].upper():
-            reason = " ".join(lines[1:]) if len(lines) > 1 else ""
-            return option, reason
-
-    # Fallback: scan whole text
+    m = _VOTE_RE.match(text)
+    if m:
+        return m.group(1).upper(), " ".join(m.group(2).split())
+
+    # Fallback: vote keyword buried somewhere in the reply
+    m = _VOTE_RE.search(text)
+    if m:
+        return m.group(1).upper(), text.strip()
+
+    # Last resort before defaulting: plain substring scan, which also
+    # catches inflected forms ("Rejected...") that the word-boundary
+    # regex misses.
+    upper = text.upper()
     for option in VOTE_OPTIONS:
-        if option in text.upper():
-            return option, text
-    return "APPROVE", text
+        if option in upper:
+            return option, text.strip()
+    return "APPROVE", text.strip()
 
 
 def _tally_votes(votes: list[dict]) -> tuple[bool, str]:
@@ -268,6 +570,9 @@ def _tally_votes(votes: list[dict]) -> tuple[bool, str]:
     summary_parts = [f"APPROVE: {approve_count}/{total}",
                      f"REJECT: {reject_count}/{total}",
                      f"NEEDS REVISION: {revision_count}/{total}"]
+    not_polled = counts.get("NOT POLLED", 0)
+    if not_polled:
+        summary_parts.append(f"NOT POLLED: {not_polled}/{total}")
     summary = " | ".join(summary_parts)
 
     approved = approve_count > (total / 2)
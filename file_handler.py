@@ -2,20 +2,64 @@
 file_handler.py — File upload processing and URL context fetching.
 """
 
+import asyncio
+import atexit
+import hashlib
 import io
+import ipaddress
 import re
 import os
+import socket
 from pathlib import Path
-from typing import Union
+from typing import Callable, Optional, Union
 from urllib.parse import urlparse
 
 from config import MAX_FILE_SIZE_MB, ALLOWED_EXTENSIONS
 
+try:
+    from selectolax.parser import HTMLParser as _HTMLParser  # type: ignore
+    _SELECTOLAX_AVAILABLE = True
+except ImportError:
+    _SELECTOLAX_AVAILABLE = False
+
+# URL content cache: {url: (etag, text)}. Persisted across processes when
+# diskcache is installed; plain in-memory dict otherwise. Entries are only
+# stored when the server sends an ETag, so they can be revalidated with
+# If-None-Match instead of re-downloading.
+try:
+    import diskcache as _diskcache  # type: ignore
+    _URL_CACHE = _diskcache.Cache(os.path.expanduser("~/.aicouncil/cache"))
+except Exception:  # noqa: BLE001 — missing package or unwritable cache dir
+    _URL_CACHE = {}
+
+# Parsed-PDF cache keyed by content hash — PDF extraction dominates context
+# builds, and iterative debates re-attach the same documents.
+_PDF_CACHE: dict[str, str] = {}
+_PDF_CACHE_MAX = 64
+
+# Precompiled patterns for _strip_html — skips the re-cache dict probe and
+# compile check that string-pattern re.sub pays on every call.
+_RE_SCRIPT = re.compile(r"<(script|style)[^>]*>.*?</(script|style)[^>]*>",
+                        re.DOTALL | re.IGNORECASE)
+_RE_TAG = re.compile(r"<[^>]+>")
+_RE_WS = re.compile(r"\s+")
+
 
 # ---------------------------------------------------------------------------
 # URL validation
 # ---------------------------------------------------------------------------
 
+# Names with special meaning that never resolve to something safe to fetch.
+_BLOCKED_NAMES = ("localhost", "metadata.google.internal")
+
+
+def _is_blocked_address(ip) -> bool:
+    """True for any address range that must never be fetched (RFC-1918,
+    loopback, link-local incl. cloud metadata, multicast, reserved)."""
+    return (ip.is_private or ip.is_loopback or ip.is_link_local or
+            ip.is_reserved or ip.is_multicast or ip.is_unspecified)
+
+
 def _validate_url(url: str) -> None:
     """
     Raise ValueError if the URL is unsafe (non-HTTP/S, or points to a
@@ -25,24 +69,31 @@ def _validate_url(url: str) -> None:
     if parsed.scheme not in ("http", "https"):
         raise ValueError(f"Only http:// and https:// URLs are allowed. Got: {url!r}")
 
+    # urlparse lowercases the hostname and strips IPv6 brackets already.
     hostname = parsed.hostname or ""
-    # Block loopback, link-local, and private IP ranges
-    _BLOCKED_HOSTNAMES = (
-        "localhost",
-        "127.",
-        "0.0.0.0",
-        "::1",
-        "169.254.",   # link-local
-        "10.",        # RFC-1918
-        "172.",       # RFC-1918 (172.16.0.0/12)
-        "192.168.",   # RFC-1918
-        "fd",         # IPv6 ULA
-        "fc",         # IPv6 ULA
-        "metadata.google.internal",
-        "169.254.169.254",  # AWS/GCP metadata
-    )
-    for blocked in _BLOCKED_HOSTNAMES:
-        if hostname.startswith(blocked) or hostname == blocked.rstrip("."):
+    if hostname in _BLOCKED_NAMES:
+        raise ValueError(f"Requests to internal/private addresses are not allowed: {url!r}")
+
+    try:
+        ip = ipaddress.ip_address(hostname)
+    except ValueError:
+        ip = None
+
+    if ip is not None:
+        # Literal address: one C-level range check — and unlike the previous
+        # prefix matching, 172.x is only blocked inside 172.16.0.0/12.
+        if _is_blocked_address(ip):
+            raise ValueError(f"Requests to internal/private addresses are not allowed: {url!r}")
+        return
+
+    # Hostname: resolve and check every address it maps to, which closes the
+    # DNS-based bypass of literal-only checks.
+    try:
+        infos = socket.getaddrinfo(hostname, None)
+    except socket.gaierror as exc:
+        raise ValueError(f"Could not resolve host for URL: {url!r}") from exc
+    for info in infos:
+        if _is_blocked_address(ipaddress.ip_address(info[4][0])):
             raise ValueError(f"Requests to internal/private addresses are not allowed: {url!r}")
 
 
@@ -85,7 +136,12 @@ def extract_text_from_file(filename: str,
 
 
 def _extract_pdf(file_bytes: bytes, filename: str) -> str:
-    """Extract text from a PDF using PyPDF2."""
+    """Extract text from a PDF using PyPDF2 (content-hash cached)."""
+    key = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+    cached = _PDF_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     try:
         import PyPDF2  # type: ignore
     except ImportError as exc:
@@ -94,39 +150,101 @@ def _extract_pdf(file_bytes: bytes, filename: str) -> str:
         ) from exc
 
     reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-    pages = []
+    # Write pages into one buffer instead of a pages list + join, which held
+    # two full copies of the text in memory for large documents.
+    buf = io.StringIO()
     for page in reader.pages:
         text = page.extract_text()
         if text:
-            pages.append(text)
-    if not pages:
+            buf.write(text)
+            buf.write("\n\n")
+    result = buf.getvalue().rstrip()
+    if not result:
         raise ValueError(f"Could not extract any text from '{filename}'.")
-    return "\n\n".join(pages)
+
+    if len(_PDF_CACHE) >= _PDF_CACHE_MAX:
+        _PDF_CACHE.pop(next(iter(_PDF_CACHE)))
+    _PDF_CACHE[key] = result
+    return result
 
 
 # ---------------------------------------------------------------------------
 # URL content fetching
 # ---------------------------------------------------------------------------
 
-def fetch_url_content(url: str) -> str:
-    """
-    Fetch the text content of a URL.
-    Returns plain text (strips HTML tags for HTML pages).
-    Raises ValueError for unsafe URLs.
-    """
-    _validate_url(url)
+_http_client = None
+
+
+def _get_http_client():
+    """Shared pooled client — avoids a fresh DNS/TCP/TLS handshake per URL."""
+    global _http_client
+    if _http_client is None:
+        try:
+            import httpx
+        except ImportError as exc:
+            raise ImportError("httpx is required. Run: pip install httpx") from exc
+        _http_client = httpx.Client(
+            timeout=15,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+        )
+        atexit.register(_http_client.close)
+    return _http_client
+
+
+# Keyed by event loop — concurrent Streamlit sessions each run their own
+# loop, and a single shared slot would let them evict (and leak) each
+# other's pooled client.
+_async_http_clients: dict = {}
 
+
+def _get_async_http_client():
+    """Shared pooled async client, cached per event loop (async connections
+    bind to the loop that created them)."""
     try:
         import httpx
     except ImportError as exc:
         raise ImportError("httpx is required. Run: pip install httpx") from exc
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=15,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+        )
+        _async_http_clients[loop] = client
+    return client
+
 
-    with httpx.Client(timeout=15, follow_redirects=True) as client:
-        resp = client.get(url, headers={"User-Agent": "AIcouncil/1.0"})
-        resp.raise_for_status()
-        content_type = resp.headers.get("content-type", "")
-        text = resp.text
+async def _aclose_async_http_client() -> None:
+    """Close the running loop's pooled client — it would otherwise be
+    stranded open when the loop is torn down."""
+    client = _async_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
 
+
+def _conditional_headers(url: str) -> tuple[dict, Optional[tuple]]:
+    """Request headers plus the cached (etag, text) entry for this URL, with
+    If-None-Match set when a revalidatable copy exists."""
+    cached = _URL_CACHE.get(url)
+    headers = {"User-Agent": "AIcouncil/1.0"}
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    return headers, cached
+
+
+def _store_url_result(url: str, resp, text: str) -> None:
+    etag = resp.headers.get("etag")
+    if etag:
+        try:
+            _URL_CACHE[url] = (etag, text)
+        except Exception:  # noqa: BLE001 — cache write failure is non-fatal
+            pass
+
+
+def _process_response_text(content_type: str, text: str) -> str:
     if "html" in content_type:
         text = _strip_html(text)
 
@@ -138,19 +256,68 @@ def fetch_url_content(url: str) -> str:
     return text
 
 
+async def afetch_url_content(url: str) -> str:
+    """
+    Async fetch of a URL's text content over the shared pooled client.
+    Returns plain text (strips HTML tags for HTML pages).
+    Raises ValueError for unsafe URLs.
+    """
+    # _validate_url resolves the hostname with blocking getaddrinfo; run it
+    # off-loop so one slow resolver can't stall every concurrent fetch.
+    await asyncio.get_running_loop().run_in_executor(None, _validate_url, url)
+
+    headers, cached = _conditional_headers(url)
+    resp = await _get_async_http_client().get(url, headers=headers)
+    if resp.status_code == 304 and cached:
+        return cached[1]
+    resp.raise_for_status()
+    text = _process_response_text(resp.headers.get("content-type", ""), resp.text)
+    _store_url_result(url, resp, text)
+    return text
+
+
+def fetch_url_content(url: str) -> str:
+    """
+    Fetch the text content of a URL.
+    Returns plain text (strips HTML tags for HTML pages).
+    Raises ValueError for unsafe URLs.
+    """
+    _validate_url(url)
+
+    headers, cached = _conditional_headers(url)
+    resp = _get_http_client().get(url, headers=headers)
+    if resp.status_code == 304 and cached:
+        return cached[1]
+    resp.raise_for_status()
+    text = _process_response_text(resp.headers.get("content-type", ""), resp.text)
+    _store_url_result(url, resp, text)
+    return text
+
+
 def _strip_html(html_text: str) -> str:
-    """Very simple HTML tag stripper (no external dependency required)."""
+    """HTML tag stripper.
+
+    Uses selectolax when installed — a single C-level pass that also handles
+    entities and nested tags — and falls back to a three-pass regex strip
+    (with a full string allocation per pass) otherwise.
+    """
+    if _SELECTOLAX_AVAILABLE:
+        tree = _HTMLParser(html_text)
+        # .text() would include raw script/style source — drop those nodes
+        # first, matching what the regex fallback strips.
+        for node in tree.css("script, style"):
+            node.decompose()
+        root = tree.body or tree.root
+        if root is None:
+            return ""
+        return _RE_WS.sub(" ", root.text(separator=" ")).strip()
+
     # Remove script/style blocks (allow any characters inside the closing tag name)
-    html_text = re.sub(
-        r"<(script|style)[^>]*>.*?</(script|style)[^>]*>",
-        " ",
-        html_text,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
+    html_text = _RE_SCRIPT.sub(" ", html_text)
     # Remove all tags
-    html_text = re.sub(r"<[^>]+>", " ", html_text)
+    html_text = _RE_TAG.sub(" ", html_text)
     # Collapse whitespace
-    html_text = re.sub(r"\s+", " ", html_text).strip()
+    html_text = _RE_WS.sub(" ", html_text).strip()
     return html_text
 
 
@@ -158,22 +325,53 @@ def _strip_html(html_text: str) -> str:
 # Context builder
 # ---------------------------------------------------------------------------
 
-def format_context(uploaded_files: list[dict], urls: list[str]) -> str:
+def format_context(uploaded_files: list[dict], urls: list[str],
+                   fetcher: Optional[Callable[[str], str]] = None) -> str:
     """
     Build a combined context string from uploaded files and URLs.
 
     `uploaded_files` is a list of {"name": str, "text": str} dicts.
+    `fetcher` lets callers substitute a caching wrapper around
+    `fetch_url_content` (e.g. Streamlit's st.cache_data).
     """
     parts: list[str] = []
 
     for f in uploaded_files:
         parts.append(f"### File: {f['name']}\n```\n{f['text']}\n```")
 
-    for url in urls:
-        try:
-            content = fetch_url_content(url)
-            parts.append(f"### URL: {url}\n{content}")
-        except Exception:  # noqa: BLE001
+    if fetcher is not None:
+        # Caller-supplied fetcher (e.g. a caching wrapper) — call it per URL.
+        # Only expected fetch failures (unsafe URL, network, HTTP status)
+        # degrade to a placeholder; programming errors propagate instead of
+        # being masked as "[Failed to fetch URL content]".
+        import httpx  # the fetch paths require it anyway
+
+        results = []
+        for url in urls:
+            try:
+                results.append(fetcher(url))
+            except (ValueError, OSError, httpx.HTTPError) as exc:
+                results.append(exc)
+    elif urls:
+        # Fetch all URLs concurrently; total latency is the slowest fetch
+        # instead of the sum.
+        async def _fetch_all() -> list:
+            try:
+                return await asyncio.gather(
+                    *(afetch_url_content(u) for u in urls), return_exceptions=True)
+            finally:
+                # asyncio.run tears this loop down on return — release the
+                # pooled connections bound to it.
+                await _aclose_async_http_client()
+
+        results = asyncio.run(_fetch_all())
+    else:
+        results = []
+
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
             parts.append(f"### URL: {url}\n[Failed to fetch URL content]")
+        else:
+            parts.append(f"### URL: {url}\n{result}")
 
     return "\n\n".join(parts)
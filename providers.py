@@ -10,13 +10,20 @@ Supports:
 
 All providers expose a single function signature:
     chat(messages, model, **kwargs) -> str
+plus an async twin:
+    achat(messages, model, **kwargs) -> str
 """
 
+import asyncio
+import functools
+import hashlib
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional
 
 import httpx
-from openai import OpenAI
+import orjson
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
 
 try:
@@ -26,47 +33,203 @@ except ImportError:
     _COHERE_AVAILABLE = False
 
 from config import PROVIDERS
+from agents import CACHE_BOUNDARY
 
 load_dotenv()
 
+# Content-addressed response cache for deterministic calls. Only requests
+# with temperature == 0 are cached — at the default temperature the model
+# is expected to vary, so replaying a stored reply would change behavior.
+# Persisted across processes when diskcache is installed (24h TTL); plain
+# in-memory dict otherwise.
+try:
+    import diskcache as _diskcache  # type: ignore
+    _RESPONSE_CACHE = _diskcache.Cache(os.path.expanduser("~/.aicouncil/responses"))
+except Exception:  # noqa: BLE001 — missing package or unwritable cache dir
+    _RESPONSE_CACHE = {}
+
+_RESPONSE_CACHE_MAX = 2048
+_RESPONSE_CACHE_TTL = 86400
+
+
+def _response_cache_key(provider_id: str, messages: list[dict], model: str,
+                        kwargs: dict) -> Optional[str]:
+    """Cache key for a deterministic request, or None if it isn't cacheable."""
+    if kwargs.get("temperature", 0.7) != 0:
+        return None
+    payload = orjson.dumps(
+        [provider_id, model, messages, kwargs.get("max_tokens", 2048)])
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _store_response(key: str, content: str) -> None:
+    try:
+        if isinstance(_RESPONSE_CACHE, dict):
+            if len(_RESPONSE_CACHE) >= _RESPONSE_CACHE_MAX:
+                _RESPONSE_CACHE.pop(next(iter(_RESPONSE_CACHE)))
+            _RESPONSE_CACHE[key] = content
+        else:
+            _RESPONSE_CACHE.set(key, content, expire=_RESPONSE_CACHE_TTL)
+    except Exception:  # noqa: BLE001 — cache write failure is non-fatal
+        pass
+
+
+def _apply_cache_boundary(provider_id: str, messages: list[dict]) -> list[dict]:
+    """
+    Translate the CACHE_BOUNDARY sentinel into the provider's explicit
+    cache-breakpoint API where one exists (e.g. Anthropic cache_control,
+    Gemini cached content). None of the current providers expose one
+    through the interfaces used here, so the sentinel is stripped before
+    the request goes out; the stable-prefix ordering still benefits from
+    implicit provider-side prefix caching.
+    """
+    cleaned = None
+    for i, msg in enumerate(messages):
+        content = msg.get("content", "")
+        if CACHE_BOUNDARY in content:
+            if cleaned is None:
+                cleaned = list(messages)
+            cleaned[i] = {**msg, "content": content.replace(f"{CACHE_BOUNDARY}\n", "")
+                                                   .replace(CACHE_BOUNDARY, "")}
+    return cleaned if cleaned is not None else messages
+
 
 # ---------------------------------------------------------------------------
-# Helper: build OpenAI-compatible client
+# Shared HTTP connection pools
+#
+# Building a client per call re-does DNS, TCP, and TLS setup every time —
+# several hundred ms of handshake per agent step on the REST path. The pools
+# below are shared across calls instead. Async clients bind their connections
+# to the running event loop, and each debate runs under its own asyncio.run,
+# so the async pools are cached per loop (same pattern as the registry's
+# semaphores).
 # ---------------------------------------------------------------------------
 
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Bounded pool for SDK calls that only exist in blocking form. Running them
+# inline in a coroutine would stall every other agent on the loop for the
+# duration of the network round trip; the default executor is unbounded, so
+# a dedicated capped pool keeps thread fan-out predictable.
+_BLOCKING_POOL = ThreadPoolExecutor(max_workers=16,
+                                    thread_name_prefix="provider-blocking")
+
+
+async def _run_blocking(fn, *args, **kwargs):
+    """Run a blocking provider call on the bounded pool without holding up
+    the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _BLOCKING_POOL, functools.partial(fn, *args, **kwargs))
+
+# Keyed by event loop, not a single slot: Streamlit runs sessions in
+# concurrent script threads, each debate on its own loop, so one shared slot
+# would make interleaved debates evict (and leak) each other's clients.
+_async_http: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def _shared_async_http() -> httpx.AsyncClient:
+    """Pooled HTTP/2 client shared by all async REST calls on this loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_http.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(http2=True, timeout=60, limits=_HTTP_LIMITS)
+        _async_http[loop] = client
+    return client
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_sync_http() -> httpx.Client:
+    return httpx.Client(http2=True, timeout=60, limits=_HTTP_LIMITS)
+
+
+@functools.lru_cache(maxsize=None)
 def _openai_client(provider_id: str) -> Optional[OpenAI]:
     cfg = PROVIDERS[provider_id]
-    api_key = os.getenv(cfg["env_key"], "")
+    api_key = os.getenv(cfg.env_key, "")
+    if not api_key:
+        return None
+    return OpenAI(api_key=api_key, base_url=cfg.base_url)
+
+
+_async_clients: dict[asyncio.AbstractEventLoop, dict[str, AsyncOpenAI]] = {}
+
+
+def _async_openai_client(provider_id: str) -> Optional[AsyncOpenAI]:
+    cfg = PROVIDERS[provider_id]
+    api_key = os.getenv(cfg.env_key, "")
     if not api_key:
         return None
-    return OpenAI(api_key=api_key, base_url=cfg["base_url"])
+    loop = asyncio.get_running_loop()
+    per_loop = _async_clients.setdefault(loop, {})
+    client = per_loop.get(provider_id)
+    if client is None:
+        client = AsyncOpenAI(api_key=api_key, base_url=cfg.base_url)
+        per_loop[provider_id] = client
+    return client
+
+
+async def aclose_async_clients() -> None:
+    """Close the async pools bound to the running loop.
+
+    Each debate runs under its own asyncio.run; without an explicit close
+    at the end of the run, every loop teardown would strand one full set of
+    pooled connections (leaked sockets plus ResourceWarnings at GC).
+    Clients belonging to other loops — concurrent debates in other
+    Streamlit sessions — are left alone.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_http.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+    for client in _async_clients.pop(loop, {}).values():
+        await client.close()
 
 
 # ---------------------------------------------------------------------------
 # Per-provider chat functions
 # ---------------------------------------------------------------------------
 
+def _openai_extra_body(kwargs: dict) -> Optional[dict]:
+    """Route all of one agent's calls to the same prompt-cache shard; without
+    the key, load balancing across backend replicas misses the cached prefix."""
+    cache_key = kwargs.get("prompt_cache_key")
+    return {"prompt_cache_key": cache_key} if cache_key else None
+
+
 def _chat_openai_compatible(provider_id: str, messages: list[dict],
                              model: str, **kwargs) -> str:
     client = _openai_client(provider_id)
     if client is None:
         raise ValueError(f"No API key configured for provider '{provider_id}'. "
-                         f"Set {PROVIDERS[provider_id]['env_key']} in your .env file.")
+                         f"Set {PROVIDERS[provider_id].env_key} in your .env file.")
     response = client.chat.completions.create(
         model=model,
         messages=messages,
         max_tokens=kwargs.get("max_tokens", 2048),
         temperature=kwargs.get("temperature", 0.7),
+        extra_body=_openai_extra_body(kwargs),
     )
     return response.choices[0].message.content or ""
 
 
-def _chat_google(messages: list[dict], model: str, **kwargs) -> str:
-    api_key = os.getenv("GOOGLE_API_KEY", "")
-    if not api_key:
-        raise ValueError("No API key configured for Google. Set GOOGLE_API_KEY in your .env file.")
+async def _achat_openai_compatible(provider_id: str, messages: list[dict],
+                                   model: str, **kwargs) -> str:
+    client = _async_openai_client(provider_id)
+    if client is None:
+        raise ValueError(f"No API key configured for provider '{provider_id}'. "
+                         f"Set {PROVIDERS[provider_id].env_key} in your .env file.")
+    response = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=kwargs.get("max_tokens", 2048),
+        temperature=kwargs.get("temperature", 0.7),
+        extra_body=_openai_extra_body(kwargs),
+    )
+    return response.choices[0].message.content or ""
+
 
-    # Convert OpenAI-style messages to Google format
+def _google_payload(messages: list[dict], **kwargs) -> dict:
+    """Convert OpenAI-style messages into a Gemini generateContent payload."""
     contents = []
     system_text = ""
     for msg in messages:
@@ -85,34 +248,52 @@ def _chat_google(messages: list[dict], model: str, **kwargs) -> str:
         "maxOutputTokens": kwargs.get("max_tokens", 2048),
         "temperature": kwargs.get("temperature", 0.7),
     }
+    return payload
 
-    url = f"{PROVIDERS['google']['base_url']}/{model}:generateContent"
-    with httpx.Client(timeout=60) as client:
-        resp = client.post(
-            url,
-            params={"key": api_key},
-            json=payload,
-            headers={"Content-Type": "application/json"},
-        )
-        resp.raise_for_status()
-        data = resp.json()
 
+def _google_extract(data: dict) -> str:
     try:
         return data["candidates"][0]["content"]["parts"][0]["text"]
     except (KeyError, IndexError) as exc:
         raise RuntimeError(f"Unexpected Google API response: {data}") from exc
 
 
-def _chat_cohere(messages: list[dict], model: str, **kwargs) -> str:
-    api_key = os.getenv("COHERE_API_KEY", "")
+def _chat_google(messages: list[dict], model: str, **kwargs) -> str:
+    api_key = os.getenv("GOOGLE_API_KEY", "")
     if not api_key:
-        raise ValueError("No API key configured for Cohere. Set COHERE_API_KEY in your .env file.")
+        raise ValueError("No API key configured for Google. Set GOOGLE_API_KEY in your .env file.")
 
-    if not _COHERE_AVAILABLE:
-        raise ImportError("cohere package not installed. Run: pip install cohere")
+    payload = _google_payload(messages, **kwargs)
+    url = f"{PROVIDERS['google'].base_url}/{model}:generateContent"
+    resp = _shared_sync_http().post(
+        url,
+        params={"key": api_key},
+        content=orjson.dumps(payload),
+        headers={"Content-Type": "application/json"},
+    )
+    resp.raise_for_status()
+    return _google_extract(orjson.loads(resp.content))
 
-    client = _cohere.Client(api_key)
 
+async def _achat_google(messages: list[dict], model: str, **kwargs) -> str:
+    api_key = os.getenv("GOOGLE_API_KEY", "")
+    if not api_key:
+        raise ValueError("No API key configured for Google. Set GOOGLE_API_KEY in your .env file.")
+
+    payload = _google_payload(messages, **kwargs)
+    url = f"{PROVIDERS['google'].base_url}/{model}:generateContent"
+    resp = await _shared_async_http().post(
+        url,
+        params={"key": api_key},
+        content=orjson.dumps(payload),
+        headers={"Content-Type": "application/json"},
+    )
+    resp.raise_for_status()
+    return _google_extract(orjson.loads(resp.content))
+
+
+def _cohere_request(messages: list[dict], **kwargs) -> dict:
+    """Convert OpenAI-style messages into cohere Client.chat kwargs."""
     # Separate system message from conversation
     system_text = ""
     cohere_messages = []
@@ -131,14 +312,43 @@ def _chat_cohere(messages: list[dict], model: str, **kwargs) -> str:
     else:
         user_message = ""
 
-    response = client.chat(
-        model=model,
-        message=user_message,
-        chat_history=cohere_messages if cohere_messages else None,
-        preamble=system_text if system_text else None,
-        max_tokens=kwargs.get("max_tokens", 2048),
-        temperature=kwargs.get("temperature", 0.7),
-    )
+    return {
+        "message": user_message,
+        "chat_history": cohere_messages if cohere_messages else None,
+        "preamble": system_text if system_text else None,
+        "max_tokens": kwargs.get("max_tokens", 2048),
+        "temperature": kwargs.get("temperature", 0.7),
+    }
+
+
+def _chat_cohere(messages: list[dict], model: str, **kwargs) -> str:
+    api_key = os.getenv("COHERE_API_KEY", "")
+    if not api_key:
+        raise ValueError("No API key configured for Cohere. Set COHERE_API_KEY in your .env file.")
+
+    if not _COHERE_AVAILABLE:
+        raise ImportError("cohere package not installed. Run: pip install cohere")
+
+    client = _cohere.Client(api_key)
+    response = client.chat(model=model, **_cohere_request(messages, **kwargs))
+    return response.text or ""
+
+
+async def _achat_cohere(messages: list[dict], model: str, **kwargs) -> str:
+    api_key = os.getenv("COHERE_API_KEY", "")
+    if not api_key:
+        raise ValueError("No API key configured for Cohere. Set COHERE_API_KEY in your .env file.")
+
+    if not _COHERE_AVAILABLE:
+        raise ImportError("cohere package not installed. Run: pip install cohere")
+
+    if not hasattr(_cohere, "AsyncClient"):
+        # Older SDK with only the blocking client — run it off-loop on the
+        # bounded pool so it can't stall concurrently running agents.
+        return await _run_blocking(_chat_cohere, messages, model, **kwargs)
+
+    client = _cohere.AsyncClient(api_key)
+    response = await client.chat(model=model, **_cohere_request(messages, **kwargs))
     return response.text or ""
 
 
@@ -157,17 +367,95 @@ def chat(provider_id: str, messages: list[dict], model: str, **kwargs) -> str:
     if provider_id not in PROVIDERS:
         raise ValueError(f"Unknown provider: '{provider_id}'")
 
-    provider_type = PROVIDERS[provider_id]["type"]
+    messages = _apply_cache_boundary(provider_id, messages)
+    cache_key = _response_cache_key(provider_id, messages, model, kwargs)
+    if cache_key is not None:
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    provider_type = PROVIDERS[provider_id].type
 
     if provider_type == "openai_compatible":
-        return _chat_openai_compatible(provider_id, messages, model, **kwargs)
+        content = _chat_openai_compatible(provider_id, messages, model, **kwargs)
     elif provider_type == "google":
-        return _chat_google(messages, model, **kwargs)
+        content = _chat_google(messages, model, **kwargs)
     elif provider_type == "cohere":
-        return _chat_cohere(messages, model, **kwargs)
+        content = _chat_cohere(messages, model, **kwargs)
     else:
         raise ValueError(f"Unsupported provider type: '{provider_type}'")
 
+    if cache_key is not None:
+        _store_response(cache_key, content)
+    return content
+
+
+async def achat(provider_id: str, messages: list[dict], model: str, **kwargs) -> str:
+    """
+    Async twin of `chat` — same contract, non-blocking, so independent agent
+    calls can run concurrently on the event loop.
+    """
+    if provider_id not in PROVIDERS:
+        raise ValueError(f"Unknown provider: '{provider_id}'")
+
+    messages = _apply_cache_boundary(provider_id, messages)
+    cache_key = _response_cache_key(provider_id, messages, model, kwargs)
+    if cache_key is not None:
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    provider_type = PROVIDERS[provider_id].type
+
+    if provider_type == "openai_compatible":
+        content = await _achat_openai_compatible(provider_id, messages, model, **kwargs)
+    elif provider_type == "google":
+        content = await _achat_google(messages, model, **kwargs)
+    elif provider_type == "cohere":
+        content = await _achat_cohere(messages, model, **kwargs)
+    else:
+        raise ValueError(f"Unsupported provider type: '{provider_type}'")
+
+    if cache_key is not None:
+        _store_response(cache_key, content)
+    return content
+
+
+async def achat_stream(provider_id: str, messages: list[dict], model: str,
+                       **kwargs) -> AsyncIterator[str]:
+    """
+    Streaming twin of `achat` — yields the reply incrementally so callers
+    can surface partial output while the model is still generating.
+
+    Only the OpenAI-compatible providers stream natively here; the Google
+    and Cohere REST paths fall back to a single terminal chunk, so callers
+    must not assume more than one yield.
+    """
+    if provider_id not in PROVIDERS:
+        raise ValueError(f"Unknown provider: '{provider_id}'")
+
+    messages = _apply_cache_boundary(provider_id, messages)
+
+    if PROVIDERS[provider_id].type == "openai_compatible":
+        client = _async_openai_client(provider_id)
+        if client is None:
+            raise ValueError(f"No API key configured for provider '{provider_id}'. "
+                             f"Set {PROVIDERS[provider_id].env_key} in your .env file.")
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=kwargs.get("max_tokens", 2048),
+            temperature=kwargs.get("temperature", 0.7),
+            extra_body=_openai_extra_body(kwargs),
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        return
+
+    yield await achat(provider_id, messages, model, **kwargs)
+
 
 def is_provider_configured(provider_id: str) -> bool:
     """Return True if the provider has an API key set."""
@@ -2,13 +2,37 @@
 rate_limiter.py — Per-provider rate limiting with automatic fallback.
 """
 
+import asyncio
 import time
 import threading
 from collections import deque
+from contextlib import asynccontextmanager
 from typing import Optional
 
 from config import PROVIDERS
 
+# Upper bound on simultaneous in-flight API calls across all providers.
+GLOBAL_CONCURRENCY = 32
+
+# Circuit breaker: after this many consecutive failures a provider is
+# considered down and skipped for the cooldown period instead of being
+# re-woken by every agent in the next phase.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+
+def _drop_closed_loops(per_loop: dict) -> None:
+    """Evict entries whose loop has been torn down — each debate runs under
+    its own asyncio.run, so dead loops accumulate otherwise."""
+    for loop in [l for l in per_loop if l.is_closed()]:
+        del per_loop[loop]
+
+
+class ProviderRateLimitedError(RuntimeError):
+    """Raised by acquire() when a provider's request windows are exhausted,
+    so callers can distinguish admission failure from call failure and pick
+    a fallback provider."""
+
 
 class ProviderRateLimiter:
     """Tracks request timestamps for a single provider and enforces limits."""
@@ -18,11 +42,36 @@ class ProviderRateLimiter:
         cfg = PROVIDERS.get(provider_id, {})
         self.rpm_limit: int = cfg.get("rate_limit_rpm", 60)
         self.rpd_limit: int = cfg.get("rate_limit_rpd", 10000)
+        # Below these thresholds admission can be granted without taking
+        # the lock (see can_request).
+        self._rpm_soft = int(self.rpm_limit * 0.8)
+        self._rpd_soft = int(self.rpd_limit * 0.8)
 
         self._lock = threading.Lock()
-        # Timestamps (epoch seconds) of recent requests
+        # Minute window: bounded by rpm_limit, a small deque is fine.
         self._minute_window: deque = deque()
-        self._day_window: deque = deque()
+        # Day window: a fixed-size ring of timestamps with head/tail
+        # pointers — O(1) record and amortized O(1) prune with no per-entry
+        # node allocation, unlike a deque holding thousands of entries.
+        self._day_ring: list[float] = [0.0] * self.rpd_limit
+        self._day_head: int = 0    # next write slot
+        self._day_tail: int = 0    # oldest live entry
+        self._day_count: int = 0
+        # Concurrency gates for async fan-out, one per event loop (asyncio
+        # primitives bind to their loop, and concurrent Streamlit sessions
+        # run debates on different loops — a single slot would hand each
+        # session a fresh semaphore at full count).
+        self._sems: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+    def semaphore(self) -> asyncio.Semaphore:
+        """Per-provider concurrency cap, sized from the rpm budget so a
+        parallel phase can't slam the provider into its minute limit."""
+        loop = asyncio.get_running_loop()
+        sem = self._sems.get(loop)
+        if sem is None:
+            _drop_closed_loops(self._sems)
+            sem = asyncio.Semaphore(max(1, self.rpm_limit // 4))
+            self._sems[loop] = sem
+        return sem
 
     def _prune(self) -> None:
         now = time.time()
@@ -30,22 +79,54 @@ class ProviderRateLimiter:
         day_ago = now - 86400
         while self._minute_window and self._minute_window[0] < minute_ago:
             self._minute_window.popleft()
-        while self._day_window and self._day_window[0] < day_ago:
-            self._day_window.popleft()
+        while self._day_count and self._day_ring[self._day_tail] < day_ago:
+            self._day_tail = (self._day_tail + 1) % self.rpd_limit
+            self._day_count -= 1
 
     def can_request(self) -> bool:
         """Return True if a request is allowed right now."""
+        # Lock-free fast path: the un-pruned counters can only overestimate
+        # usage (stale entries inflate them), so being comfortably below the
+        # limits is safe to grant without taking the contended lock.
+        if (len(self._minute_window) < self._rpm_soft and
+                self._day_count < self._rpd_soft):
+            return True
         with self._lock:
             self._prune()
             return (len(self._minute_window) < self.rpm_limit and
-                    len(self._day_window) < self.rpd_limit)
+                    self._day_count < self.rpd_limit)
+
+    def _record(self) -> None:
+        now = time.time()
+        self._minute_window.append(now)
+        if self._day_count == self.rpd_limit:
+            # Ring full (admission control normally prevents this) —
+            # overwrite the oldest entry.
+            self._day_tail = (self._day_tail + 1) % self.rpd_limit
+            self._day_count -= 1
+        self._day_ring[self._day_head] = now
+        self._day_head = (self._day_head + 1) % self.rpd_limit
+        self._day_count += 1
 
     def record_request(self) -> None:
         """Record that a request was made."""
         with self._lock:
-            now = time.time()
-            self._minute_window.append(now)
-            self._day_window.append(now)
+            self._record()
+
+    async def acan_request(self) -> bool:
+        """can_request for coroutines.
+
+        Deliberately takes the same threading lock as the sync paths: the
+        windows are mutated from other threads too (another session's
+        sidebar calling stats(), concurrent debate loops), so a separate
+        asyncio lock would just race them. The mutex is uncontended and
+        held for a handful of list/ring ops, which is fine on the loop.
+        """
+        return self.can_request()
+
+    async def arecord_request(self) -> None:
+        """record_request for coroutines — see acan_request on locking."""
+        self.record_request()
 
     def stats(self) -> dict:
         """Return current usage statistics."""
@@ -55,10 +136,10 @@ class ProviderRateLimiter:
                 "provider": self.provider_id,
                 "rpm_used": len(self._minute_window),
                 "rpm_limit": self.rpm_limit,
-                "rpd_used": len(self._day_window),
+                "rpd_used": self._day_count,
                 "rpd_limit": self.rpd_limit,
                 "available": (len(self._minute_window) < self.rpm_limit and
-                              len(self._day_window) < self.rpd_limit),
+                              self._day_count < self.rpd_limit),
             }
 
 
@@ -69,6 +150,57 @@ class RateLimiterRegistry:
         self._limiters: dict[str, ProviderRateLimiter] = {
             pid: ProviderRateLimiter(pid) for pid in PROVIDERS
         }
+        self._global_sems: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        # Circuit-breaker state, keyed by provider id.
+        self._breaker_lock = threading.Lock()
+        self._failures: dict[str, int] = {}
+        self._opened_until: dict[str, float] = {}
+
+    def record_failure(self, provider_id: str) -> None:
+        """Count a failed call; opens the breaker after repeated failures."""
+        with self._breaker_lock:
+            count = self._failures.get(provider_id, 0) + 1
+            self._failures[provider_id] = count
+            if count >= BREAKER_FAILURE_THRESHOLD:
+                self._opened_until[provider_id] = (
+                    time.time() + BREAKER_COOLDOWN_SECONDS)
+
+    def record_success(self, provider_id: str) -> None:
+        """A successful call closes the breaker and resets the failure count."""
+        if provider_id in self._failures or provider_id in self._opened_until:
+            with self._breaker_lock:
+                self._failures.pop(provider_id, None)
+                self._opened_until.pop(provider_id, None)
+
+    def _global_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._global_sems.get(loop)
+        if sem is None:
+            _drop_closed_loops(self._global_sems)
+            sem = asyncio.Semaphore(GLOBAL_CONCURRENCY)
+            self._global_sems[loop] = sem
+        return sem
+
+    @asynccontextmanager
+    async def acquire(self, provider_id: str):
+        """
+        Admission control for one async provider call: the global gate bounds
+        total in-flight requests, the per-provider semaphore throttles
+        fan-out bursts below the rpm budget, and the request is recorded
+        against the window limits before the call proceeds.
+
+        Raises ProviderRateLimitedError if the provider's window limits are
+        exhausted.
+        """
+        limiter = self.get(provider_id)
+        async with self._global_semaphore():
+            async with limiter.semaphore():
+                if not await limiter.acan_request():
+                    raise ProviderRateLimitedError(
+                        f"Provider '{provider_id}' is rate-limited."
+                    )
+                await limiter.arecord_request()
+                yield
 
     def get(self, provider_id: str) -> ProviderRateLimiter:
         if provider_id not in self._limiters:
@@ -76,6 +208,8 @@ class RateLimiterRegistry:
         return self._limiters[provider_id]
 
     def can_request(self, provider_id: str) -> bool:
+        if self._opened_until.get(provider_id, 0.0) > time.time():
+            return False  # breaker open — provider recently kept failing
         return self.get(provider_id).can_request()
 
     def record_request(self, provider_id: str) -> None:
@@ -85,27 +219,31 @@ class RateLimiterRegistry:
         return [limiter.stats() for limiter in self._limiters.values()]
 
     def find_available_fallback(self, preferred_provider: str,
-                                provider_type: Optional[str] = None) -> Optional[str]:
+                                provider_type: Optional[str] = None,
+                                exclude: Optional[set] = None) -> Optional[str]:
         """
         Return the first available provider that isn't rate-limited.
         Prefers the `preferred_provider`, then tries others of the same type,
-        then any available provider.
+        then any available provider. Providers in `exclude` are skipped even
+        if their windows look open — callers use it for providers whose
+        admission just failed despite the advisory can_request check.
         """
-        if self.can_request(preferred_provider):
+        exclude = exclude or ()
+        if preferred_provider not in exclude and self.can_request(preferred_provider):
             return preferred_provider
 
         pref_type = PROVIDERS.get(preferred_provider, {}).get("type")
 
         # Try same-type providers first
         for pid, cfg in PROVIDERS.items():
-            if pid == preferred_provider:
+            if pid == preferred_provider or pid in exclude:
                 continue
             if cfg.get("type") == pref_type and self.can_request(pid):
                 return pid
 
         # Try any provider
         for pid in PROVIDERS:
-            if pid != preferred_provider and self.can_request(pid):
+            if pid != preferred_provider and pid not in exclude and self.can_request(pid):
                 return pid
 
         return None